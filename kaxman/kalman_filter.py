@@ -1,8 +1,8 @@
-from typing import Tuple
+from typing import Callable, Optional, Tuple, Union
 
 import jax
 import jax.numpy as jnp
-import numpyro.distributions as dist
+import jax.scipy.linalg as jsl
 from jax import lax
 from jax.tree_util import register_pytree_node_class
 from jaxtyping import Array, Float
@@ -25,16 +25,180 @@ def _inflate_missing(non_valid_mask: jnp.ndarray, r: jnp.ndarray, inflation: flo
     """
 
     diag_inflation = jnp.where(non_valid_mask, inflation, 0.0)
-    r_masked = r + jnp.diag(diag_inflation)
+    r_masked = r.at[jnp.diag_indices(r.shape[-1])].add(diag_inflation)
 
     return r_masked
 
 
+def _symmetrize(x: jnp.ndarray) -> jnp.ndarray:
+    """
+    Symmetrizes a square matrix by averaging it with its transpose.
+
+    Args:
+        x: Square matrix of shape (dim, dim).
+
+    Returns:
+        The symmetric part of x.
+    """
+
+    return 0.5 * (x + x.T)
+
+
+def _mvn_logpdf(x: jnp.ndarray, mean: jnp.ndarray, chol: jnp.ndarray) -> jnp.ndarray:
+    """
+    Evaluates the log density of a multivariate normal parameterized by the Cholesky factor of its covariance.
+
+    Args:
+        x: Point to evaluate, shape (dim,).
+        mean: Mean of the distribution, shape (dim,).
+        chol: Lower Cholesky factor of the covariance, shape (dim, dim).
+
+    Returns:
+        The log density at x.
+    """
+
+    z = jsl.solve_triangular(chol, x - mean, lower=True)
+    log_det = 2.0 * jnp.log(jnp.abs(jnp.diag(chol))).sum()
+
+    return -0.5 * (z @ z + log_det + x.shape[-1] * jnp.log(2.0 * jnp.pi))
+
+
+def _psd_sqrt(x: jnp.ndarray) -> jnp.ndarray:
+    """
+    Computes a square root L of a positive semi-definite matrix, such that L L^T = x. Uses the Cholesky factor where it
+    exists, and otherwise falls back to the eigendecomposition based U sqrt(max(lambda, 0)). The fallback is only
+    evaluated when needed, as the gradient of eigh is undefined for repeated eigenvalues, e.g. for x = q I.
+
+    Args:
+        x: Positive semi-definite matrix of shape (dim, dim).
+
+    Returns:
+        A square root of x, shape (dim, dim). Triangular if x is positive definite.
+    """
+
+    def eigh_sqrt():
+        eigenvalues, eigenvectors = jnp.linalg.eigh(x)
+        return eigenvectors * jnp.sqrt(jnp.clip(eigenvalues, 0.0))
+
+    chol = jnp.linalg.cholesky(x)
+
+    return lax.cond(jnp.isfinite(chol).all(), lambda: chol, eigh_sqrt)
+
+
+def _psd_solve(a: jnp.ndarray, b: jnp.ndarray) -> jnp.ndarray:
+    """
+    Solves a x = b for a positive semi-definite matrix a. Uses a Cholesky based solve where the factor exists, and
+    otherwise falls back to the minimum norm solution via the pseudo-inverse.
+
+    Args:
+        a: Positive semi-definite matrix of shape (dim, dim).
+        b: Right hand side of shape (dim, k).
+
+    Returns:
+        The solution x of shape (dim, k).
+    """
+
+    chol = jnp.linalg.cholesky(a)
+
+    return lax.cond(jnp.isfinite(chol).all(), lambda: jsl.cho_solve((chol, True), b), lambda: jnp.linalg.pinv(a) @ b)
+
+
+def _sample_gaussian_noise(
+    rng_key: jax.random.PRNGKey, cov: Union[jnp.ndarray, Callable], time_inds: jnp.ndarray
+) -> jnp.ndarray:
+    """
+    Draws zero mean Gaussian noise for all timesteps at once.
+
+    Args:
+        rng_key: Random key.
+        cov: Static positive semi-definite covariance matrix of shape (dim, dim), or callable of time returning it.
+        time_inds: Time indices of shape (num_timesteps,).
+
+    Returns:
+        Noise of shape (num_timesteps, dim).
+    """
+
+    if callable(cov):
+        chols = jax.vmap(lambda t: _psd_sqrt(cov(t)))(time_inds)
+        z = jax.random.normal(rng_key, chols.shape[:-1], dtype=chols.dtype)
+
+        return (chols @ z[..., None])[..., 0]
+
+    chol = _psd_sqrt(cov)
+    z = jax.random.normal(rng_key, time_inds.shape + chol.shape[-1:], dtype=chol.dtype)
+
+    return z @ chol.T
+
+
+def _solve_filter_riccati(
+    f: jnp.ndarray, h: jnp.ndarray, process_cov: jnp.ndarray, r: jnp.ndarray, num_iterations: int = 32
+) -> jnp.ndarray:
+    """
+    Solves the discrete algebraic Riccati equation of the Kalman filter
+        P = F P F^T - F P H^T (H P H^T + R)^{-1} H P F^T + G Q G^T
+    for the steady state predicted covariance, using the structure preserving doubling algorithm. Every iteration
+    doubles the horizon of the equivalent Riccati recursion, hence a modest fixed number of iterations suffices.
+
+    Args:
+        f: Transition matrix of shape (state_dim, state_dim).
+        h: Observation matrix of shape (obs_dim, state_dim).
+        process_cov: Process noise covariance G Q G^T of shape (state_dim, state_dim).
+        r: Observation covariance of shape (obs_dim, obs_dim).
+        num_iterations: Number of doubling iterations.
+
+    Returns:
+        The steady state predicted covariance of shape (state_dim, state_dim).
+    """
+
+    eye = jnp.eye(f.shape[0], dtype=process_cov.dtype)
+
+    def doubling_step(_, state):
+        a_k, g_k, h_k = state
+
+        w = eye + g_k @ h_k
+        a_w_inv = jnp.linalg.solve(w.T, a_k.T).T
+
+        a_next = a_w_inv @ a_k
+        g_next = _symmetrize(g_k + a_w_inv @ g_k @ a_k.T)
+        h_next = _symmetrize(h_k + a_k.T @ h_k @ jnp.linalg.solve(w, a_k))
+
+        return a_next, g_next, h_next
+
+    init_state = (f.T, h.T @ jnp.linalg.solve(r, h), process_cov)
+    _, _, steady_cov = lax.fori_loop(0, num_iterations, doubling_step, init_state)
+
+    return steady_cov
+
+
+def _as_function(value: Union[jnp.ndarray, Callable], depends_on_state: bool = False) -> Callable:
+    """
+    Wraps a static parameter in a function of time (and optionally state), or returns it as is if already callable.
+
+    Args:
+        value: Static array or callable.
+        depends_on_state: Whether the function should take the previous state as a second argument.
+
+    Returns:
+        A function returning the parameter.
+    """
+
+    if callable(value):
+        return value
+
+    if depends_on_state:
+        return lambda t, x: value
+
+    return lambda t: value
+
+
 @register_pytree_node_class
 class KalmanFilter:
     """
     A JAX-based Kalman Filter supporting partial missing data, offsets, optional noise transform,
-    integrated log-likelihood, and RTS smoothing. Uses pseudo-inverse to handle degenerate covariances.
+    integrated log-likelihood, and RTS smoothing. Missing observations are handled by inflating the observation
+    covariance, which keeps the innovation covariance positive definite and allows for Cholesky based solves. The
+    sequential filter is implemented in square root form, propagating Cholesky factors of the covariances. Q_t and
+    the initial covariance need only be positive semi-definite, whereas R_t is required to be positive definite.
 
     Args:
         initial_mean: Mean of the initial state, shape (state_dim,).
@@ -48,6 +212,21 @@ class KalmanFilter:
         noise_transform: G_t, shape (state_dim, noise_dim) or callable returning it.
             If None, an identity matrix of size (state_dim, state_dim) is used.
         variance_inflation: Inflation factor for missing dimensions in the observation covariance.
+        parallel: Whether to run the forward filter as a parallel prefix scan (Särkkä & García-Fernández), which has
+            logarithmic depth in the number of timesteps. Requires a static transition matrix.
+        unroll: Number of iterations to unroll in the sequential scans, trading compile time for less loop overhead
+            on small state dimensions.
+        matmul_dtype: Optional lower precision dtype, e.g. jnp.bfloat16, used for the products of the transition and
+            observation matrices with the covariance factors in the sequential filter. Results are accumulated in the
+            precision of the covariance. Lossy, hence only recommended for large and well conditioned models.
+        steady_state: Whether to use the steady state (precomputed) Kalman gain after steady_state_warmup exact
+            filtering steps, which avoids all covariance computations in the scan. Requires F, Q, H, R and G to be
+            static. Missing observations only have their residuals zeroed, i.e. the gain is not adapted to them, whereas
+            the log likelihood uses the innovation covariance with the variance inflation of the exact filter. The
+            smoother likewise uses the steady state covariances as both predicted and filtered covariances after the
+            warmup, hence the smoothed covariances are approximations that are not adapted to missing observations.
+        steady_state_warmup: Number of exact filtering steps before switching to the steady state gain. If zero, the
+            steady state gain is used from the first step and the initial covariance is ignored.
     """
 
     def __init__(
@@ -62,7 +241,25 @@ class KalmanFilter:
         observation_offset: Float[Array, "obs_dim"] = None,  # noqa: F821
         noise_transform: Float[Array, "state_dim noise_dim"] = None,  # noqa: F722
         variance_inflation: float = 1e8,
+        parallel: bool = False,
+        unroll: int = 1,
+        matmul_dtype: Optional[jnp.dtype] = None,
+        steady_state: bool = False,
+        steady_state_warmup: int = 10,
     ):
+        if parallel and callable(transition_matrix):
+            raise ValueError("The parallel filter requires a static transition matrix!")
+
+        if parallel and steady_state:
+            raise ValueError("Cannot use both the parallel filter and the steady state gain!")
+
+        time_varying = (transition_matrix, transition_cov, observation_matrix, observation_cov, noise_transform)
+        if steady_state and any(callable(p) for p in time_varying):
+            raise ValueError("The steady state gain requires static F, Q, H, R and G!")
+
+        if steady_state_warmup < 0:
+            raise ValueError("The number of steady state warmup steps must be non-negative!")
+
         self.initial_mean = initial_mean
         self.initial_cov = initial_cov
 
@@ -80,6 +277,20 @@ class KalmanFilter:
 
         self.noise_transform = noise_transform
         self.variance_inflation = variance_inflation
+        self.parallel = parallel
+        self.unroll = unroll
+        self.matmul_dtype = matmul_dtype
+        self.steady_state = steady_state
+        self.steady_state_warmup = steady_state_warmup
+
+        # NB: resolve static/callable parameters once, so the scan bodies need not branch
+        self._transition_matrix_fn = _as_function(self.transition_matrix, depends_on_state=True)
+        self._transition_cov_fn = _as_function(self.transition_cov)
+        self._observation_matrix_fn = _as_function(self.observation_matrix)
+        self._observation_cov_fn = _as_function(self.observation_cov)
+        self._transition_offset_fn = _as_function(self.transition_offset)
+        self._observation_offset_fn = _as_function(self.observation_offset)
+        self._noise_transform_fn = _as_function(self.noise_transform)
 
     def tree_flatten(self):
         children = (
@@ -94,7 +305,14 @@ class KalmanFilter:
             self.noise_transform,
         )
 
-        aux_data = dict(variance_inflation=self.variance_inflation)
+        aux_data = dict(
+            variance_inflation=self.variance_inflation,
+            parallel=self.parallel,
+            unroll=self.unroll,
+            matmul_dtype=self.matmul_dtype,
+            steady_state=self.steady_state,
+            steady_state_warmup=self.steady_state_warmup,
+        )
         return children, aux_data
 
     @classmethod
@@ -124,109 +342,402 @@ class KalmanFilter:
             **aux_data,
         )
 
-    def _get_transition_matrix(self, t: int, x_prev: jnp.ndarray) -> jnp.ndarray:
-        if callable(self.transition_matrix):
-            return self.transition_matrix(t, x_prev)
-
-        return self.transition_matrix
+    def _build_process_noise_factor_fn(self) -> Callable[[int], jnp.ndarray]:
+        """
+        Returns a function of time evaluating G_t L_t, where L_t L_t^T = Q_t, i.e. a square root of the process noise
+        covariance. Q_t may be singular. If both G and Q are static the factor is computed once and closed over.
+        """
 
-    def _get_transition_cov(self, t: int) -> jnp.ndarray:
-        if callable(self.transition_cov):
-            return self.transition_cov(t)
+        if callable(self.noise_transform) or callable(self.transition_cov):
+            return lambda t: self._noise_transform_fn(t) @ _psd_sqrt(self._transition_cov_fn(t))
 
-        return self.transition_cov
+        noise_factor = self.noise_transform @ _psd_sqrt(self.transition_cov)
 
-    def _get_observation_matrix(self, t: int) -> jnp.ndarray:
-        if callable(self.observation_matrix):
-            return self.observation_matrix(t)
+        return lambda t: noise_factor
 
-        return self.observation_matrix
+    def _build_process_cov_fn(self) -> Callable[[int], jnp.ndarray]:
+        """
+        Returns a function of time evaluating G_t Q_t G_t^T as the symmetric product M_t M_t^T, with M_t = G_t L_t and
+        L_t the positive semi-definite square root of Q_t from _build_process_noise_factor_fn, hence Q_t may be
+        singular. If both G and Q are static the product is computed once and closed over.
+        """
 
-    def _get_observation_cov(self, t: int) -> jnp.ndarray:
-        if callable(self.observation_cov):
-            return self.observation_cov(t)
+        noise_factor_fn = self._build_process_noise_factor_fn()
 
-        return self.observation_cov
+        if callable(self.noise_transform) or callable(self.transition_cov):
 
-    def _get_transition_offset(self, t: int) -> jnp.ndarray:
-        if callable(self.transition_offset):
-            return self.transition_offset(t)
+            def process_cov_fn(t):
+                noise_factor = noise_factor_fn(t)
+                return noise_factor @ noise_factor.T
 
-        return self.transition_offset
+            return process_cov_fn
 
-    def _get_observation_offset(self, t: int) -> jnp.ndarray:
-        if callable(self.observation_offset):
-            return self.observation_offset(t)
+        noise_factor = noise_factor_fn(0)
+        process_cov = noise_factor @ noise_factor.T
 
-        return self.observation_offset
+        return lambda t: process_cov
 
-    def _predict(self, mean: jnp.ndarray, cov: jnp.ndarray, t: int) -> Tuple[jnp.ndarray, jnp.ndarray]:
-        f_t = self._get_transition_matrix(t, mean)
-        q_t = self._get_transition_cov(t)
-        b_t = self._get_transition_offset(t)
-        g_t = self.noise_transform
+    def _predict(
+        self, mean: jnp.ndarray, cov: jnp.ndarray, t: int, process_cov: jnp.ndarray
+    ) -> Tuple[jnp.ndarray, jnp.ndarray]:
+        f_t = self._transition_matrix_fn(t, mean)
+        b_t = self._transition_offset_fn(t)
 
         mean_pred = f_t @ mean + b_t
-        cov_pred = f_t @ cov @ f_t.T + g_t @ q_t @ g_t.T
+        cov_pred = _symmetrize(f_t @ cov @ f_t.T + process_cov)
 
         return mean_pred, cov_pred
 
-    def _update(
+    def _factor_matmul(self, a: jnp.ndarray, chol: jnp.ndarray) -> jnp.ndarray:
+        """
+        Computes a @ chol, optionally in lower precision while accumulating in the precision of chol.
+        """
+
+        if self.matmul_dtype is None:
+            return a @ chol
+
+        return jnp.matmul(
+            a.astype(self.matmul_dtype), chol.astype(self.matmul_dtype), preferred_element_type=chol.dtype
+        )
+
+    def _predict_sqrt(
+        self, mean: jnp.ndarray, chol: jnp.ndarray, t: int, f_t: jnp.ndarray, noise_factor: jnp.ndarray
+    ) -> Tuple[jnp.ndarray, jnp.ndarray]:
+        b_t = self._transition_offset_fn(t)
+
+        mean_pred = f_t @ mean + b_t
+
+        # NB: [F L, G L_Q] [F L, G L_Q]^T = F P F^T + G Q G^T, re-triangularized via QR
+        stacked = jnp.concatenate([self._factor_matmul(f_t, chol), noise_factor], axis=-1)
+        chol_pred = jnp.linalg.qr(stacked.T, mode="r").T
+
+        return mean_pred, chol_pred
+
+    def _update_sqrt(
         self,
         mean_pred: jnp.ndarray,
-        cov_pred: jnp.ndarray,
-        obs_t: jnp.ndarray,
+        chol_pred: jnp.ndarray,
+        residual: jnp.ndarray,
         h: jnp.ndarray,
-        s_inverse: jnp.ndarray,
-    ) -> Tuple[jnp.ndarray, jnp.ndarray]:
-        gain = cov_pred @ h.T @ s_inverse
-        residual = obs_t - h @ mean_pred
+        r_chol: jnp.ndarray,
+    ) -> Tuple[jnp.ndarray, jnp.ndarray, jnp.ndarray]:
+        """
+        Square root (array form) measurement update. Lower triangularizing the pre-array
+            [[L_R, H L_P], [0, L_P]]
+        yields the post-array
+            [[L_S, 0], [K L_S, L_P+]]
+        where L_S is the Cholesky factor of the innovation covariance, K the Kalman gain and L_P+ the factor of the
+        corrected covariance. The innovation covariance is thus never formed explicitly.
+        """
 
-        corrected_mean = mean_pred + gain @ residual
-        corrected_cov = cov_pred - gain @ h @ cov_pred
+        obs_dim, state_dim = h.shape
 
-        return corrected_mean, corrected_cov
+        pre_array = jnp.block(
+            [
+                [r_chol, self._factor_matmul(h, chol_pred)],
+                [jnp.zeros((state_dim, obs_dim), dtype=chol_pred.dtype), chol_pred],
+            ]
+        )
+        post_array = jnp.linalg.qr(pre_array.T, mode="r").T
 
-    def _forward_pass(
+        s_chol = post_array[:obs_dim, :obs_dim]
+        scaled_gain = post_array[obs_dim:, :obs_dim]
+        corrected_chol = post_array[obs_dim:, obs_dim:]
+
+        corrected_mean = mean_pred + scaled_gain @ jsl.solve_triangular(s_chol, residual, lower=True)
+
+        return corrected_mean, corrected_chol, s_chol
+
+    def _update_sqrt_scalar(
+        self,
+        mean_pred: jnp.ndarray,
+        chol_pred: jnp.ndarray,
+        residual: jnp.ndarray,
+        h: jnp.ndarray,
+        r: jnp.ndarray,
+    ) -> Tuple[jnp.ndarray, jnp.ndarray, jnp.ndarray]:
+        """
+        Square root measurement update for scalar observations (Potter). With phi = L_P^T h the innovation variance is
+        S = phi^T phi + r, and the corrected factor is given by the rank one update
+            L_P+ = L_P - beta (L_P phi) phi^T,  beta = 1 / (S + sqrt(S r)),
+        which satisfies L_P+ L_P+^T = P - P h h^T P / S. Note that L_P+ is not triangular.
+        """
+
+        phi = self._factor_matmul(h[None], chol_pred)[0]
+        innovation_var = phi @ phi + r
+
+        scaled_gain = chol_pred @ phi
+        corrected_mean = mean_pred + scaled_gain * (residual / innovation_var)
+
+        beta = 1.0 / (innovation_var + jnp.sqrt(innovation_var * r))
+        corrected_chol = chol_pred - beta * jnp.outer(scaled_gain, phi)
+
+        return corrected_mean, corrected_chol, innovation_var
+
+    def _sequential_forward_pass(
         self, observations: jnp.ndarray
-    ) -> Tuple[jnp.ndarray, jnp.ndarray, jnp.ndarray, jnp.ndarray, jnp.ndarray]:
-        def scan_fn(carry, obs_t):
-            t, mean_tm1, cov_tm1, ll_tm1 = carry
+    ) -> Tuple[jnp.ndarray, jnp.ndarray, jnp.ndarray, jnp.ndarray, jnp.ndarray, Optional[jnp.ndarray]]:
+        """
+        Square root Kalman filter, propagating Cholesky factors of the covariances through the scan. Scalar
+        observations use a dedicated update avoiding any matrix factorizations.
+        """
 
-            x_pred_mean, x_pred_cov = self._predict(mean_tm1, cov_tm1, t)
+        noise_factor_fn = self._build_process_noise_factor_fn()
+        scalar_observations = observations.shape[-1] == 1
+        state_dependent_transition = callable(self.transition_matrix)
 
-            h_t = self._get_observation_matrix(t)
-            r_t = self._get_observation_cov(t)
-            d_t = self._get_observation_offset(t)
+        def scan_fn(carry, xs_t):
+            t, mean_tm1, chol_tm1, ll_tm1 = carry
+            obs_t, nan_mask = xs_t
 
-            nan_mask = jnp.isnan(obs_t)
+            f_t = self._transition_matrix_fn(t, mean_tm1)
+            x_pred_mean, x_pred_chol = self._predict_sqrt(mean_tm1, chol_tm1, t, f_t, noise_factor_fn(t))
+
+            h_t = self._observation_matrix_fn(t)
+            r_t = self._observation_cov_fn(t)
+            d_t = self._observation_offset_fn(t)
 
             # TODO: need to verify this...
             r_t = _inflate_missing(nan_mask, r_t, inflation=self.variance_inflation)
 
             y_pred_mean = h_t @ x_pred_mean + d_t
-            y_pred_cov = h_t @ x_pred_cov @ h_t.T + r_t
 
             obs_masked = jnp.where(nan_mask, y_pred_mean, obs_t)
-            s_inv = jnp.linalg.pinv(y_pred_cov)
+            residual = obs_masked - y_pred_mean
+
+            if scalar_observations:
+                corrected_mean_t, corrected_chol_t, s_t = self._update_sqrt_scalar(
+                    x_pred_mean, x_pred_chol, residual[0], h_t[0], r_t[0, 0]
+                )
+                step_log_prob = -0.5 * (residual[0] ** 2 / s_t + jnp.log(2.0 * jnp.pi * s_t))
+            else:
+                corrected_mean_t, corrected_chol_t, s_chol = self._update_sqrt(
+                    x_pred_mean, x_pred_chol, residual, h_t, jnp.linalg.cholesky(r_t)
+                )
+                step_log_prob = _mvn_logpdf(obs_masked, y_pred_mean, s_chol)
 
-            dist_y = dist.MultivariateNormal(loc=y_pred_mean, covariance_matrix=y_pred_cov)
-            step_log_prob = dist_y.log_prob(obs_masked)
             ll_t = ll_tm1 + step_log_prob
 
-            corrected_mean_t, corrected_cov_t = self._update(x_pred_mean, x_pred_cov, obs_masked, h_t, s_inv)
+            carry_t = (t + 1, corrected_mean_t, corrected_chol_t, ll_t)
+            outputs_t = (x_pred_mean, x_pred_chol, corrected_mean_t, corrected_chol_t)
 
-            carry_t = (t + 1, corrected_mean_t, corrected_cov_t, ll_t)
-            return carry_t, (x_pred_mean, x_pred_cov, corrected_mean_t, corrected_cov_t)
+            # NB: state dependent transition matrices are stored so the smoother need not re-evaluate them
+            if state_dependent_transition:
+                outputs_t += (f_t,)
 
-        init_carry = (1, self.initial_mean, self.initial_cov, 0.0)
-        final_carry, (predicted_means, predicted_covs, filtered_means, filtered_covs) = lax.scan(
-            scan_fn, init_carry, observations
-        )
+            return carry_t, outputs_t
+
+        # NB: compute the missing value masks for the whole series at once, outside of the scan
+        nan_masks = jnp.isnan(observations)
+
+        init_carry = (1, self.initial_mean, _psd_sqrt(self.initial_cov), 0.0)
+        final_carry, outputs = lax.scan(scan_fn, init_carry, (observations, nan_masks), unroll=self.unroll)
+
+        predicted_means, predicted_chols, filtered_means, filtered_chols = outputs[:4]
+        transition_matrices = outputs[4] if state_dependent_transition else None
 
         _, _, _, total_ll = final_carry
 
-        return predicted_means, predicted_covs, filtered_means, filtered_covs, total_ll
+        predicted_covs = predicted_chols @ jnp.swapaxes(predicted_chols, -1, -2)
+        filtered_covs = filtered_chols @ jnp.swapaxes(filtered_chols, -1, -2)
+
+        return predicted_means, predicted_covs, filtered_means, filtered_covs, total_ll, transition_matrices
+
+    def _parallel_forward_pass(
+        self, observations: jnp.ndarray
+    ) -> Tuple[jnp.ndarray, jnp.ndarray, jnp.ndarray, jnp.ndarray, jnp.ndarray, Optional[jnp.ndarray]]:
+        """
+        Parallel Kalman filter following "Temporal Parallelization of Bayesian Smoothers" by Särkkä and
+        García-Fernández. Each timestep is mapped to an element (A, b, C, eta, J), where (A, b, C) describes the
+        filtering distribution conditional on the previous state and (eta, J) the information form likelihood of the
+        previous state. The elements are combined with an associative operator.
+        """
+
+        process_cov_fn = self._build_process_cov_fn()
+        f = self.transition_matrix
+
+        num_timesteps = observations.shape[0]
+        state_dim = self.initial_mean.shape[0]
+        time_inds = jnp.arange(num_timesteps) + 1
+        nan_masks = jnp.isnan(observations)
+
+        def filtering_element(t, obs_t, nan_mask, prior_mean, prior_cov):
+            h_t = self._observation_matrix_fn(t)
+            r_t = self._observation_cov_fn(t)
+            d_t = self._observation_offset_fn(t)
+
+            r_t = _inflate_missing(nan_mask, r_t, inflation=self.variance_inflation)
+            h_t = jnp.where(nan_mask[:, None], 0.0, h_t)
+
+            residual = jnp.where(nan_mask, 0.0, obs_t - h_t @ prior_mean - d_t)
+
+            s_cho = jsl.cho_factor(h_t @ prior_cov @ h_t.T + r_t, lower=True)
+            gain = jsl.cho_solve(s_cho, h_t @ prior_cov).T
+            i_kh = jnp.eye(state_dim) - gain @ h_t
+
+            a = i_kh @ f
+            b = prior_mean + gain @ residual
+            c = _symmetrize(i_kh @ prior_cov @ i_kh.T + gain @ r_t @ gain.T)
+
+            hf = h_t @ f
+            eta = hf.T @ jsl.cho_solve(s_cho, residual)
+            j = _symmetrize(hf.T @ jsl.cho_solve(s_cho, hf))
+
+            return a, b, c, eta, j
+
+        # NB: the first element conditions on the initial distribution rather than the previous state, which is
+        # selected inside the vmapped function to avoid computing and then overwriting it
+        first_mean, first_cov = self._predict(self.initial_mean, self.initial_cov, 1, process_cov_fn(1))
+
+        def element(t, obs_t, nan_mask):
+            is_first = t == 1
+
+            prior_mean = jnp.where(is_first, first_mean, self._transition_offset_fn(t))
+            prior_cov = jnp.where(is_first, first_cov, process_cov_fn(t))
+
+            a, b, c, eta, j = filtering_element(t, obs_t, nan_mask, prior_mean, prior_cov)
+
+            return jnp.where(is_first, 0.0, a), b, c, jnp.where(is_first, 0.0, eta), jnp.where(is_first, 0.0, j)
+
+        a, b, c, eta, j = jax.vmap(element)(time_inds, observations, nan_masks)
+
+        def combine(earlier, later):
+            a_i, b_i, c_i, eta_i, j_i = earlier
+            a_j, b_j, c_j, eta_j, j_j = later
+
+            eye = jnp.eye(state_dim)
+
+            # NB: as C and J are symmetric, (I + J_j C_i)^{-1} = ((I + C_i J_j)^{-1})^T
+            m = jnp.linalg.inv(eye + c_i @ j_j)
+            a_j_m = a_j @ m
+            a_i_t_n = jnp.swapaxes(a_i, -1, -2) @ jnp.swapaxes(m, -1, -2)
+
+            a_ij = a_j_m @ a_i
+            b_ij = (a_j_m @ (b_i + (c_i @ eta_j[..., None])[..., 0])[..., None])[..., 0] + b_j
+            c_ij = a_j_m @ c_i @ jnp.swapaxes(a_j, -1, -2) + c_j
+            eta_ij = (a_i_t_n @ (eta_j - (j_j @ b_i[..., None])[..., 0])[..., None])[..., 0] + eta_i
+            j_ij = a_i_t_n @ j_j @ a_i + j_i
+
+            c_ij = 0.5 * (c_ij + jnp.swapaxes(c_ij, -1, -2))
+            j_ij = 0.5 * (j_ij + jnp.swapaxes(j_ij, -1, -2))
+
+            return a_ij, b_ij, c_ij, eta_ij, j_ij
+
+        _, filtered_means, filtered_covs, _, _ = lax.associative_scan(combine, (a, b, c, eta, j))
+
+        # NB: predictions and log likelihood only depend on the previous filtered state and can thus be vectorized
+        previous_means = jnp.concatenate([self.initial_mean[None], filtered_means[:-1]], axis=0)
+        previous_covs = jnp.concatenate([self.initial_cov[None], filtered_covs[:-1]], axis=0)
+
+        def predict_and_log_prob(t, obs_t, nan_mask, mean_tm1, cov_tm1):
+            x_pred_mean, x_pred_cov = self._predict(mean_tm1, cov_tm1, t, process_cov_fn(t))
+
+            h_t = self._observation_matrix_fn(t)
+            r_t = self._observation_cov_fn(t)
+            d_t = self._observation_offset_fn(t)
+
+            r_t = _inflate_missing(nan_mask, r_t, inflation=self.variance_inflation)
+
+            y_pred_mean = h_t @ x_pred_mean + d_t
+            y_pred_cov = h_t @ x_pred_cov @ h_t.T + r_t
+
+            obs_masked = jnp.where(nan_mask, y_pred_mean, obs_t)
+            log_prob = _mvn_logpdf(obs_masked, y_pred_mean, jnp.linalg.cholesky(y_pred_cov))
+
+            return x_pred_mean, x_pred_cov, log_prob
+
+        predicted_means, predicted_covs, log_probs = jax.vmap(predict_and_log_prob)(
+            time_inds, observations, nan_masks, previous_means, previous_covs
+        )
+
+        return predicted_means, predicted_covs, filtered_means, filtered_covs, log_probs.sum(), None
+
+    def _steady_state_forward_pass(
+        self, observations: jnp.ndarray
+    ) -> Tuple[jnp.ndarray, jnp.ndarray, jnp.ndarray, jnp.ndarray, jnp.ndarray, Optional[jnp.ndarray]]:
+        """
+        Runs the exact filter for the warmup period, after which the gain is fixed at its steady state value derived
+        from the solution of the discrete algebraic Riccati equation. Only the mean is propagated in the scan.
+        """
+
+        num_timesteps = observations.shape[0]
+        num_warmup = min(self.steady_state_warmup, num_timesteps)
+
+        warmup_outputs = self._sequential_forward_pass(observations[:num_warmup])
+
+        if num_warmup == num_timesteps:
+            return warmup_outputs
+
+        f = self.transition_matrix
+        h = self.observation_matrix
+        r = self.observation_cov
+
+        predicted_cov = _solve_filter_riccati(f, h, self._build_process_cov_fn()(0), r)
+
+        cross_cov = h @ predicted_cov
+        innovation_cov = cross_cov @ h.T + r
+        s_cho = jsl.cho_factor(innovation_cov, lower=True)
+        gain = jsl.cho_solve(s_cho, cross_cov).T
+        filtered_cov = _symmetrize(predicted_cov - gain @ cross_cov)
+
+        def scan_fn(carry, xs_t):
+            t, mean_tm1, ll_tm1 = carry
+            obs_t, nan_mask = xs_t
+
+            x_pred_mean = f @ mean_tm1 + self._transition_offset_fn(t)
+            y_pred_mean = h @ x_pred_mean + self._observation_offset_fn(t)
+
+            obs_masked = jnp.where(nan_mask, y_pred_mean, obs_t)
+            corrected_mean_t = x_pred_mean + gain @ (obs_masked - y_pred_mean)
+
+            # NB: same convention as the exact filter, i.e. missing dimensions are scored against an inflated
+            # innovation covariance, which is only factored for steps with missing observations
+            s_chol_t = lax.cond(
+                nan_mask.any(),
+                lambda: jnp.linalg.cholesky(
+                    _inflate_missing(nan_mask, innovation_cov, inflation=self.variance_inflation)
+                ),
+                lambda: s_cho[0],
+            )
+            ll_t = ll_tm1 + _mvn_logpdf(obs_masked, y_pred_mean, s_chol_t)
+
+            return (t + 1, corrected_mean_t, ll_t), (x_pred_mean, corrected_mean_t)
+
+        warmup_predicted_means, warmup_predicted_covs, warmup_means, warmup_covs, warmup_ll, _ = warmup_outputs
+
+        steady_observations = observations[num_warmup:]
+        nan_masks = jnp.isnan(steady_observations)
+
+        # NB: without warmup the scan starts from the initial mean
+        init_mean = warmup_means[-1] if num_warmup > 0 else self.initial_mean
+        init_carry = (num_warmup + 1, init_mean, warmup_ll)
+        (_, _, total_ll), (predicted_means, filtered_means) = lax.scan(
+            scan_fn, init_carry, (steady_observations, nan_masks), unroll=self.unroll
+        )
+
+        num_steady = num_timesteps - num_warmup
+        predicted_covs = jnp.broadcast_to(predicted_cov, (num_steady,) + predicted_cov.shape)
+        filtered_covs = jnp.broadcast_to(filtered_cov, (num_steady,) + filtered_cov.shape)
+
+        return (
+            jnp.concatenate([warmup_predicted_means, predicted_means], axis=0),
+            jnp.concatenate([warmup_predicted_covs, predicted_covs], axis=0),
+            jnp.concatenate([warmup_means, filtered_means], axis=0),
+            jnp.concatenate([warmup_covs, filtered_covs], axis=0),
+            total_ll,
+            None,
+        )
+
+    def _forward_pass(
+        self, observations: jnp.ndarray
+    ) -> Tuple[jnp.ndarray, jnp.ndarray, jnp.ndarray, jnp.ndarray, jnp.ndarray, Optional[jnp.ndarray]]:
+        if self.parallel:
+            return self._parallel_forward_pass(observations)
+
+        if self.steady_state:
+            return self._steady_state_forward_pass(observations)
+
+        return self._sequential_forward_pass(observations)
 
     def filter(self, observations: jnp.ndarray) -> FilterResult:
         """
@@ -234,88 +745,120 @@ class KalmanFilter:
         FilterResult(means, covariances, log_likelihood).
         """
 
-        (_, __, filtered_means, filtered_covs, total_ll) = self._forward_pass(observations)
+        (_, __, filtered_means, filtered_covs, total_ll, ___) = self._forward_pass(observations)
 
         return FilterResult(filtered_means, filtered_covs, total_ll)
 
+    def filter_batch(self, observations: jnp.ndarray) -> FilterResult:
+        """
+        Runs forward filtering over a batch of independent series of shape (batch, num_timesteps, obs_dim), vectorized
+        over the leading axis. Returns a FilterResult where each field has a leading batch dimension.
+        """
+
+        return jax.vmap(self.filter)(observations)
+
     # TODO: fix
     def smooth(self, observations: jnp.ndarray, missing_value: float = 1e12) -> SmoothingResult:
         """
         Runs forward filtering + RTS backward pass for smoothing, returning
         SmoothResult(means, covariances, log_likelihood).
 
-        The backward pass uses a reverse-time lax.scan to fill in smoothed results for each time step.
+        The backward pass is expressed as a composition of affine maps on the smoothed (mean, covariance), which is
+        associative and is thus evaluated with a parallel reverse-time lax.associative_scan.
         """
-        predicted_means, predicted_covs, filter_means, filter_covs, ll = self._forward_pass(observations)
-
-        def rts_step(carry, aux_t):
-            mean_next, cov_next = carry
-            t, mean_f, cov_f, mean_p, cov_p = aux_t
-
-            f_t = self._get_transition_matrix(t + 1, mean_f)
-            cov_inv = jnp.linalg.pinv(cov_p)
-
-            a_t = cov_f @ f_t.T @ cov_inv
-            curr_mean_smooth = mean_f + a_t @ (mean_next - mean_p)
-            curr_cov_smooth = cov_f + a_t @ (cov_next - cov_p) @ a_t.T
-
-            return (curr_mean_smooth, curr_cov_smooth), (curr_mean_smooth, curr_cov_smooth)
-
-        carry_init = (filter_means[-1], filter_covs[-1])
-
-        num_timesteps = observations.shape[0]
-        time_inds = jnp.arange(num_timesteps)[:-1]
-
-        xs = (
-            time_inds,
+        (
+            predicted_means,
+            predicted_covs,
+            filter_means,
+            filter_covs,
+            ll,
+            transition_matrices,
+        ) = self._forward_pass(observations)
+
+        def smoothing_element(f_t, mean_f, cov_f, mean_p, cov_p):
+            # NB: cov_p is symmetric, hence A_t = (cov_p^{-1} F_t cov_f)^T, and may be singular
+            a_t = _psd_solve(cov_p, f_t @ cov_f).T
+            b_t = mean_f - a_t @ mean_p
+            c_t = _symmetrize(cov_f - a_t @ cov_p @ a_t.T)
+
+            return a_t, b_t, c_t
+
+        def combine(later, earlier):
+            a_l, b_l, c_l = later
+            a_e, b_e, c_e = earlier
+
+            a = a_e @ a_l
+            b = (a_e @ b_l[..., None])[..., 0] + b_e
+            c = a_e @ c_l @ jnp.swapaxes(a_e, -1, -2) + c_e
+
+            return a, b, 0.5 * (c + jnp.swapaxes(c, -1, -2))
+
+        # NB: the filtered state at t is propagated with the transition used for predicting t + 1, for state dependent
+        # transitions these are reused from the forward pass
+        if transition_matrices is None:
+            transition_matrices, f_axis = self.transition_matrix, None
+        else:
+            transition_matrices, f_axis = transition_matrices[1:], 0
+
+        a, b, c = jax.vmap(smoothing_element, in_axes=(f_axis, 0, 0, 0, 0))(
+            transition_matrices,
             filter_means[:-1],
             filter_covs[:-1],
             predicted_means[1:],
             predicted_covs[1:],
         )
 
-        _, (smoothed_means, smoothed_covariances) = lax.scan(rts_step, carry_init, xs, reverse=True)
+        state_dim = filter_means.shape[-1]
+        elements = (
+            jnp.concatenate([a, jnp.zeros((1, state_dim, state_dim), dtype=a.dtype)], axis=0),
+            jnp.concatenate([b, filter_means[-1:]], axis=0),
+            jnp.concatenate([c, filter_covs[-1:]], axis=0),
+        )
 
-        smoothed_means = jnp.concatenate([smoothed_means, jnp.expand_dims(filter_means[-1], axis=0)], axis=0)
-        smoothed_covariances = jnp.concatenate([smoothed_covariances, jnp.expand_dims(filter_covs[-1], axis=0)], axis=0)
+        _, smoothed_means, smoothed_covariances = lax.associative_scan(combine, elements, reverse=True)
 
         return SmoothingResult(smoothed_means, smoothed_covariances, ll)
 
+    def smooth_batch(self, observations: jnp.ndarray) -> SmoothingResult:
+        """
+        Runs smoothing over a batch of independent series of shape (batch, num_timesteps, obs_dim), vectorized over
+        the leading axis. Returns a SmoothingResult where each field has a leading batch dimension.
+        """
+
+        return jax.vmap(self.smooth)(observations)
+
     def sample(self, rng_key: jax.random.PRNGKey, num_timesteps: int) -> Tuple[jnp.ndarray, jnp.ndarray]:
         """
         Samples from the state-space model for num_timesteps.
         """
 
-        def sample_step(carry, _):
-            t, x_prev, rng_prev = carry
+        def sample_step(carry, noise_t):
+            t, x_prev = carry
+            w_t, v_t = noise_t
 
-            f_t = self._get_transition_matrix(t, x_prev)
-            q_t = self._get_transition_cov(t)
-            b_t = self._get_transition_offset(t)
-            g_t = self.noise_transform
-            h_t = self._get_observation_matrix(t)
-            r_t = self._get_observation_cov(t)
-            d_t = self._get_observation_offset(t)
-
-            rng_proc, rng_obs = jax.random.split(rng_prev)
-            noise_dim = q_t.shape[0]
-            w_t = dist.MultivariateNormal(loc=jnp.zeros(noise_dim), covariance_matrix=q_t).sample(rng_proc)
+            f_t = self._transition_matrix_fn(t, x_prev)
+            b_t = self._transition_offset_fn(t)
+            g_t = self._noise_transform_fn(t)
+            h_t = self._observation_matrix_fn(t)
+            d_t = self._observation_offset_fn(t)
 
             x_t = f_t @ x_prev + b_t + g_t @ w_t
-            obs_dim = r_t.shape[0]
-            v_t = dist.MultivariateNormal(loc=jnp.zeros(obs_dim), covariance_matrix=r_t).sample(rng_obs)
-
             y_t = h_t @ x_t + d_t + v_t
 
-            return (t + 1, x_t, rng_proc), (x_t, y_t)
+            return (t + 1, x_t), (x_t, y_t)
+
+        # NB: the noise does not depend on the state, hence we draw it for all timesteps outside of the scan
+        init_key, proc_key, obs_key = jax.random.split(rng_key, 3)
+        time_inds = jnp.arange(num_timesteps)
 
-        def init_state(key):
-            return dist.MultivariateNormal(loc=self.initial_mean, covariance_matrix=self.initial_cov).sample(key)
+        process_noise = _sample_gaussian_noise(proc_key, self.transition_cov, time_inds)
+        observation_noise = _sample_gaussian_noise(obs_key, self.observation_cov, time_inds)
 
-        x0 = init_state(rng_key)
-        init_carry = (0, x0, rng_key)
+        initial_chol = _psd_sqrt(self.initial_cov)
+        x0 = self.initial_mean + initial_chol @ jax.random.normal(init_key, self.initial_mean.shape, initial_chol.dtype)
+        init_carry = (0, x0)
 
-        _, (xs, ys) = lax.scan(sample_step, init_carry, None, length=num_timesteps)
+        _, (xs, ys) = lax.scan(sample_step, init_carry, (process_noise, observation_noise), unroll=self.unroll)
 
         return xs, ys
 